@@ -23,10 +23,12 @@ https://www.gnu.org/licenses/gpl-3.0.html
 """
 
 import maya.cmds as cmds
+import maya.api.OpenMaya as om2
+import itertools
 import json
 import os
 import re
-import uuid
+import time
 
 
 # ============================================================
@@ -42,14 +44,29 @@ INDEXED_COLORS = {
     26: "Green 3", 27: "Green 4", 28: "Blue 2", 29: "Blue 3", 30: "Purple", 31: "Dark Pink"
 }
 
+# Prebuilt swatch labels for each color index
+_INDEX_LABELS = {i: f"Selected: {n}" for i, n in INDEXED_COLORS.items()}
+
+# Arnold visibility attributes disabled on rendered control curves
+RENDER_HIDDEN_ATTRS = (
+    'castsShadows', 'aiVisibleInDiffuseReflection', 'aiVisibleInSpecularReflection',
+    'aiVisibleInDiffuseTransmission', 'aiVisibleInSpecularTransmission', 'aiVisibleInVolume',
+    'aiSelfShadows'
+)
+
 # Default control color groups
 BLOCK_GROUPS = {"MAIN CONTROLS":[17,17,17], "SIDE CONTROLS":[13,13], "SECONDARY CONTROLS":[6,6]}
 
-curve_width = None
-sample_rate = None
+_render_settings = {"curveWidth": 0.0, "sampleRate": 1}
 PANEL_NAME = "ColorPanelWorkspace"
 _color_ui_blocks = None     
 _color_ui_scroll = None   
+_INDEX_RGB = None
+_CONFIG_CACHE = None
+_NODE_COUNTER = itertools.count()
+_SESSION_STAMP = int(time.time())
+_WIRED = set()
+_SEL_CACHE = {"sel": None}
 
 
 try:
@@ -59,6 +76,8 @@ except NameError:
 
 CONFIG_PATH = os.path.join(SCRIPT_DIR, "color_config.json")
 
+_SAFE_NAME_RE = re.compile(r'[^0-9A-Za-z_]')
+
 
 
 # ============================================================
@@ -67,23 +86,52 @@ CONFIG_PATH = os.path.join(SCRIPT_DIR, "color_config.json")
 
 def safe_name(name):
     # Return a safe Maya node name containing only letters, numbers and underscores
-    return re.sub(r'[^0-9A-Za-z_]', '_', name.split('|')[-1])
+    return _SAFE_NAME_RE.sub('_', name.rsplit('|', 1)[-1])
+
+def _build_index_rgb():
+    # Query the static Maya color index table once per session
+    global _INDEX_RGB
+    if _INDEX_RGB is None:
+        _INDEX_RGB = {}
+        for i in INDEXED_COLORS:
+            try:
+                _INDEX_RGB[i] = [float(x) for x in cmds.colorIndex(i, q=True)]
+            except Exception:
+                pass
+
+def get_index_rgb(idx, default=(0.0, 0.0, 0.0)):
+    _build_index_rgb()
+    return _INDEX_RGB.get(idx, list(default))
 
 def read_json_config():
-    if os.path.exists(CONFIG_PATH):
-        try:
-            with open(CONFIG_PATH, "r") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
+    # Return the parsed config, reading it from disk only on first use
+    global _CONFIG_CACHE
+    if _CONFIG_CACHE is None:
+        _CONFIG_CACHE = {}
+        if os.path.exists(CONFIG_PATH):
+            try:
+                with open(CONFIG_PATH, "r") as f:
+                    _CONFIG_CACHE = json.load(f)
+            except Exception:
+                pass
+    return _CONFIG_CACHE
 
 def write_json_config(data):
+    global _CONFIG_CACHE
+    tmp_path = CONFIG_PATH + ".tmp"
     try:
-        with open(CONFIG_PATH, "w") as f:
-            json.dump(data, f, indent=4)
+        # Serialize in one buffered write, then swap the file in atomically
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps(data, indent=4))
+        os.replace(tmp_path, CONFIG_PATH)
+        _CONFIG_CACHE = data
         cmds.inViewMessage(amg="Configuration Saved", pos="midCenter", fade=True, backColor=(0.2,0.2,0.2))
     except Exception as e:
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
         cmds.warning("Configuration saved error: {}".format(e))
 
 
@@ -93,56 +141,52 @@ def write_json_config(data):
 # COLOR OPERATIONS
 # ============================================================
 
+def set_color_override(shape, use_rgb, color_attr, *value):
+    cmds.setAttr(shape + ".overrideEnabled", 1)
+    cmds.setAttr(shape + ".overrideRGBColors", use_rgb)
+    cmds.setAttr(shape + color_attr, *value)
+
+def apply_color_override(shapes, use_rgb, color_attr, *value):
+    cmds.undoInfo(openChunk=True)
+    try:
+        for s in shapes:
+            # Skip shapes whose overrides are locked or driven by a display layer
+            if not cmds.getAttr(s + ".overrideEnabled", settable=True):
+                continue
+            try:
+                set_color_override(s, use_rgb, color_attr, *value)
+            except RuntimeError:
+                # Color attribute locked on its own
+                pass
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
 def change_color_by_index(sel, index):
     # Apply Maya indexed color override to selected control shapes
     if not sel:
         return
-    for ctl in sel:
-        for s in cmds.listRelatives(ctl, shapes=True, fullPath=True) or []:
-            try:
-                cmds.setAttr(s + ".overrideEnabled", 1)
-                cmds.setAttr(s + ".overrideRGBColors", 0)
-                cmds.setAttr(s + ".overrideColor", index)
-            except Exception:
-                pass
+    shapes = cmds.listRelatives(sel, shapes=True, fullPath=True, noIntermediate=True) or []
+    apply_color_override(shapes, 0, ".overrideColor", index)
 
 def change_color_by_rgb(sel, rgb):
     # Apply custom RGB color override to selected control shapes
     if not sel:
         return
-    for ctl in sel:
-        for s in cmds.listRelatives(ctl, shapes=True, fullPath=True) or []:
-            try:
-                cmds.setAttr(s + ".overrideEnabled", 1)
-                cmds.setAttr(s + ".overrideRGBColors", 1)
-                cmds.setAttr(s + ".overrideColorRGB", *rgb)
-            except Exception:
-                pass
+    shapes = cmds.listRelatives(sel, shapes=True, fullPath=True, noIntermediate=True) or []
+    apply_color_override(shapes, 1, ".overrideColorRGB", *rgb)
 
 def get_current_color_of_shape(shape):
-    try:
-        if not cmds.getAttr(shape + ".overrideEnabled"):
-            return [1.0, 1.0, 1.0]
-    except Exception:
+    if not cmds.getAttr(shape + ".overrideEnabled"):
         return [1.0, 1.0, 1.0]
 
-    try:
-        if cmds.getAttr(shape + ".overrideRGBColors"):
-            val = cmds.getAttr(shape + ".overrideColorRGB")
-            if isinstance(val, (list, tuple)) and len(val) > 0:
-                return [float(x) for x in val[0]]
-            return [1.0, 1.0, 1.0]
-        else:
-            idx = int(cmds.getAttr(shape + ".overrideColor"))
-            try:
-                rgb = cmds.colorIndex(idx, q=True)
-                if rgb:
-                    return [float(x) for x in rgb]
-            except Exception:
-                return [1.0, 1.0, 1.0]
-    except Exception:
+    if cmds.getAttr(shape + ".overrideRGBColors"):
+        val = cmds.getAttr(shape + ".overrideColorRGB")
+        if val:
+            return [float(x) for x in val[0]]
         return [1.0, 1.0, 1.0]
-    return [1.0, 1.0, 1.0]
+
+    idx = int(cmds.getAttr(shape + ".overrideColor"))
+    return get_index_rgb(idx, (1.0, 1.0, 1.0))
 
 
 
@@ -152,13 +196,14 @@ def get_current_color_of_shape(shape):
 # ============================================================
 
 def update_color_block(slider, label, swatch, blocks_dict, title):
-    idx = int(cmds.intSlider(slider, q=True, value=True))
     block = blocks_dict[title]
+    idx = block["value"]
 
     if idx == -1:
         custom_rgb = block.get("rgb")
 
         if not custom_rgb:
+            block["value"] = block["lastIndex"]
             cmds.intSlider(slider, e=True, value=block["lastIndex"])
             return
 
@@ -168,24 +213,75 @@ def update_color_block(slider, label, swatch, blocks_dict, title):
 
     block["lastIndex"] = idx
 
-    try:
-        rgb = cmds.colorIndex(idx, q=True)
-    except Exception:
-        rgb = [0.0, 0.0, 0.0]
+    cmds.canvas(swatch, e=True, rgbValue=get_index_rgb(idx))
+    cmds.text(label, e=True, label=_INDEX_LABELS.get(idx) or f"Selected: Index {idx}")
 
-    cmds.canvas(swatch, e=True, rgbValue=rgb)
-    cmds.text(label, e=True,
-              label=f"Selected: {INDEXED_COLORS.get(idx, f'Index {idx}')}")
 
+def set_block_value(blocks_dict, title, value):
+    # Mirror the slider value so callers don't have to query the widget
+    blocks_dict[title]["value"] = int(value)
+
+
+def queue_color_block_update(slider, label, swatch, blocks_dict, title):
+    # Coalesce slider drag ticks into a single deferred UI refresh
+    block = blocks_dict[title]
+    if block.get("pending"):
+        return
+    block["pending"] = True
+
+    def run_update():
+        block["pending"] = False
+        if cmds.intSlider(slider, exists=True):
+            update_color_block(slider, label, swatch, blocks_dict, title)
 
-def apply_color_button(slider, swatch, blocks_dict, title):
-    sel = cmds.ls(sl=True)
-    idx = int(cmds.intSlider(slider, q=True, value=True))
-    rgb = cmds.canvas(swatch, q=True, rgbValue=True)
+    cmds.evalDeferred(run_update, lowestPriority=True)
+
+
+def _clear_selection_cache(*_):
+    _SEL_CACHE["sel"] = None
+
+def _stop_selection_dag_callback(callback_id=None):
+    # With callback_id, only stop that callback if it is still the active one
+    global _SEL_DAG_CALLBACK
+    if _SEL_DAG_CALLBACK is None or callback_id not in (None, _SEL_DAG_CALLBACK):
+        return
+    om2.MMessage.removeCallback(_SEL_DAG_CALLBACK)
+    _SEL_DAG_CALLBACK = None
+
+# Module globals survive reload(), drop the previous load's DAG callback first
+try:
+    _stop_selection_dag_callback()
+except NameError:
+    pass
+_SEL_DAG_CALLBACK = None
+
+def watch_selection_paths(ui_parent):
+    # Invalidate the selection cache for as long as ui_parent exists
+    global _SEL_DAG_CALLBACK
+    _clear_selection_cache()
+    for event in ("SelectionChanged", "NameChanged"):
+        cmds.scriptJob(event=[event, _clear_selection_cache], parent=ui_parent)
+
+    # Reparenting has no scriptJob event but changes the cached selection paths
+    _stop_selection_dag_callback()
+    _SEL_DAG_CALLBACK = om2.MDagMessage.addAllDagChangesCallback(_clear_selection_cache)
+    callback_id = _SEL_DAG_CALLBACK
+    cmds.scriptJob(uiDeleted=[ui_parent, lambda: _stop_selection_dag_callback(callback_id)], runOnce=True)
+
+def get_cached_selection():
+    # Cached long paths are dropped on selection, rename and DAG hierarchy changes
+    if _SEL_CACHE["sel"] is None:
+        _SEL_CACHE["sel"] = cmds.ls(sl=True, long=True) or []
+    return _SEL_CACHE["sel"]
+
+def apply_color_button(blocks_dict, title):
+    sel = get_cached_selection()
+    block = blocks_dict[title]
+    idx = block["value"]
     if idx >= 0:
         change_color_by_index(sel, idx)
-    else:
-        change_color_by_rgb(sel, rgb)
+    elif block.get("rgb"):
+        change_color_by_rgb(sel, block["rgb"])
 
 def create_custom_color(title, slider, blocks_dict, label, swatch):
     cmds.colorEditor()
@@ -193,6 +289,7 @@ def create_custom_color(title, slider, blocks_dict, label, swatch):
         rgb = list(cmds.colorEditor(query=True, rgb=True))
 
         blocks_dict[title]["rgb"] = rgb
+        blocks_dict[title]["value"] = -1
 
         cmds.intSlider(slider, e=True, value=-1)
         cmds.canvas(swatch, e=True, rgbValue=rgb)
@@ -225,11 +322,8 @@ def add_color_index_block(title, default_index=17, saved_data=None, blocks_dict=
         label_text = "Selected: Custom RGB"
         last_index = default_index
     else:
-        try:
-            rgb = cmds.colorIndex(saved_idx, q=True)
-        except Exception:
-            rgb = [0.0, 0.0, 0.0]
-        label_text = "Selected: " + INDEXED_COLORS.get(saved_idx, f"Index {saved_idx}")
+        rgb = get_index_rgb(saved_idx)
+        label_text = _INDEX_LABELS.get(saved_idx) or f"Selected: Index {saved_idx}"
         last_index = saved_idx
 
     label = cmds.text(label=label_text, height=20, align="center")
@@ -238,7 +332,7 @@ def add_color_index_block(title, default_index=17, saved_data=None, blocks_dict=
     cmds.separator(height=5, style="none")
     btn_form = cmds.formLayout(parent=parent)
     btn1 = cmds.button(label="Apply Color", height=28, bgc=(0.4,0.4,0.4),
-                       command=lambda *_: apply_color_button(slider, swatch, blocks_dict, title))
+                       command=lambda *_: apply_color_button(blocks_dict, title))
     btn2 = cmds.button(label="Create Custom Color", height=28, bgc=(0.4,0.4,0.4),
                        command=lambda *_: create_custom_color(title, slider, blocks_dict, label, swatch))
     cmds.formLayout(btn_form, e=True,
@@ -246,15 +340,26 @@ def add_color_index_block(title, default_index=17, saved_data=None, blocks_dict=
                     attachPosition=[(btn1, 'left', 0, 0), (btn1, 'right', 0, 48),
                                     (btn2, 'left', 0, 52), (btn2, 'right', 0, 100)])
     cmds.setParent("..")
-    cmds.intSlider(slider, e=True, dragCommand=lambda *_: update_color_block(slider, label, swatch, blocks_dict, title))
+
+    def on_slider_drag(value, *_):
+        set_block_value(blocks_dict, title, value)
+        queue_color_block_update(slider, label, swatch, blocks_dict, title)
+
+    def on_slider_change(value, *_):
+        set_block_value(blocks_dict, title, value)
+        update_color_block(slider, label, swatch, blocks_dict, title)
+
+    cmds.intSlider(slider, e=True, dragCommand=on_slider_drag, changeCommand=on_slider_change)
 
     if blocks_dict is not None:
         blocks_dict[title] = {
             "slider": slider,
+            "value": saved_idx,
             "rgb": saved_rgb if saved_idx == -1 else None,
             "lastIndex": last_index,
             "label": label,
-            "swatch": swatch}
+            "swatch": swatch,
+            "pending": False}
 
 
 
@@ -263,40 +368,60 @@ def add_color_index_block(title, default_index=17, saved_data=None, blocks_dict=
 # RENDER / ARNOLD HELPERS
 # ============================================================
 def get_curve_width():
-    if curve_width:
-        return cmds.floatField(curve_width, q=True, value=True)
-    return 0.0
+    return _render_settings["curveWidth"]
 
 def get_sample_rate():
-    if sample_rate:
-        return cmds.intField(sample_rate, q=True, value=True)
-    return 1
+    return _render_settings["sampleRate"]
+
+def _clear_wired(*_):
+    _WIRED.clear()
+
+def _forget_wiring(node):
+    # Drop cached connections touching a node that was just (re)created
+    prefix = node + "."
+    _WIRED.difference_update([p for p in _WIRED if p[0].startswith(prefix) or p[1].startswith(prefix)])
+
+def _ensure_conn(src, dst, force=False):
+    # Connect src to dst once per session, skipping the Maya query on repeat calls
+    if (src, dst) in _WIRED:
+        return
+    try:
+        if not cmds.isConnected(src, dst):
+            cmds.connectAttr(src, dst, force=force)
+        _WIRED.add((src, dst))
+    except Exception:
+        pass
+
+# Module globals survive reload(), drop the previous session's callbacks first
+try:
+    om2.MMessage.removeCallbacks(_SCENE_CALLBACKS)
+except NameError:
+    pass
+
+_SCENE_CALLBACKS = [
+    om2.MSceneMessage.addCallback(om2.MSceneMessage.kAfterNew, _clear_wired),
+    om2.MSceneMessage.addCallback(om2.MSceneMessage.kAfterOpen, _clear_wired)
+]
 
 def ensure_place2d_and_ramp(ramp_name, texture_name, curve_shader_attr):
     try:
         if not cmds.objExists(ramp_name):
             cmds.createNode('ramp', name=ramp_name)
+            _forget_wiring(ramp_name)
     except Exception:
         pass
 
     try:
         if not cmds.objExists(texture_name):
             cmds.createNode('place2dTexture', name=texture_name)
+            _forget_wiring(texture_name)
     except Exception:
         pass
 
-    try:
-        if not cmds.isConnected(texture_name + '.outUV', ramp_name + '.uv'):
-            cmds.connectAttr(texture_name + '.outUV', ramp_name + '.uv', force=False)
-    except Exception:
-        pass
-
-    try:
-        if not cmds.isConnected(texture_name + '.outUvFilterSize', ramp_name + '.uvFilterSize'):
-            cmds.connectAttr(texture_name + '.outUvFilterSize', ramp_name + '.uvFilterSize', force=False)
-    except Exception:
-        pass
+    _ensure_conn(texture_name + '.outUV', ramp_name + '.uv')
+    _ensure_conn(texture_name + '.outUvFilterSize', ramp_name + '.uvFilterSize')
 
+    # Not cached: render_selected_controls disconnects the curve shader right before this
     try:
         if not cmds.isConnected(ramp_name + '.outColor', curve_shader_attr):
             cmds.connectAttr(ramp_name + '.outColor', curve_shader_attr, force=True)
@@ -309,10 +434,12 @@ def set_ramp_color(ramp_name, rgb):
     except Exception:
         pass
 
+    # Entries [0] and [1] are overwritten below, only extra entries need removing
     try:
-        size = cmds.getAttr(ramp_name + ".colorEntryList", size=True)
-        for i in reversed(range(size)):
-            cmds.removeMultiInstance(f"{ramp_name}.colorEntryList[{i}]", b=True)
+        indices = cmds.getAttr(ramp_name + ".colorEntryList", multiIndices=True) or []
+        for i in indices:
+            if i >= 2:
+                cmds.removeMultiInstance(f"{ramp_name}.colorEntryList[{i}]", b=True)
     except Exception:
         pass
 
@@ -327,9 +454,27 @@ def set_ramp_color(ramp_name, rgb):
     except Exception:
         pass
 
+def get_node_fn(node):
+    # Return an OpenMaya 2.0 function set for the given node name
+    sel_list = om2.MSelectionList()
+    sel_list.add(node)
+    return om2.MFnDependencyNode(sel_list.getDependNode(0))
+
+def set_attr_if_present(fn, node, attr, value):
+    # Existence is checked on the function set; setAttr keeps the write undoable
+    if not fn.hasAttribute(attr):
+        return
+    try:
+        cmds.setAttr(node + '.' + attr, value)
+    except RuntimeError:
+        pass
+
 def unique_node_name(base_name):
-    short_uuid = str(uuid.uuid4())[:8]
-    return "{}_{}".format(base_name, short_uuid)
+    # Session timestamp keeps names unique across scenes, the counter within a session
+    name = "{}_{:x}{:04x}".format(base_name, _SESSION_STAMP, next(_NODE_COUNTER))
+    while cmds.objExists(name):
+        name = "{}_{:x}{:04x}".format(base_name, _SESSION_STAMP, next(_NODE_COUNTER))
+    return name
 
 
 
@@ -338,25 +483,37 @@ def unique_node_name(base_name):
 # RENDER SELECTED CONTROLS
 # ============================================================
 
+def delete_unused_nodes(nodes):
+    # Delete the given nodes that have no outgoing connections, in one batch when possible
+    # Guard: cmds.ls([]) lists every node in the scene
+    if not nodes:
+        return
+    existing = cmds.ls(nodes) or []
+    to_delete = [n for n in existing if not cmds.listConnections(n, source=False, destination=True)]
+    if not to_delete:
+        return
+
+    try:
+        cmds.delete(to_delete)
+    except Exception:
+        # One undeletable node fails the batch, fall back to deleting node by node
+        for node in to_delete:
+            try:
+                if cmds.objExists(node):
+                    cmds.delete(node)
+            except Exception:
+                pass
+
+
 def cleanup_unused_ramps_and_textures(created_ramps, created_textures):
     # Delete unused ramp and place2dTexture nodes with no outgoing connections
-    for ramp in created_ramps:
-        if cmds.objExists(ramp):
-            conns = cmds.listConnections(ramp, source=False, destination=True) or []
-            if not conns:
-                try:
-                    cmds.delete(ramp)
-                except Exception:
-                    pass
-
-    for tex in created_textures:
-        if cmds.objExists(tex):
-            conns = cmds.listConnections(tex, source=False, destination=True) or []
-            if not conns:
-                try:
-                    cmds.delete(tex)
-                except Exception:
-                    pass
+    # Ramps go first: a texture stays connected to its ramp until the ramp is gone
+    cmds.undoInfo(openChunk=True)
+    try:
+        delete_unused_nodes(created_ramps)
+        delete_unused_nodes(created_textures)
+    finally:
+        cmds.undoInfo(closeChunk=True)
 
 
 def render_selected_controls():
@@ -373,85 +530,64 @@ def render_selected_controls():
         cmds.inViewMessage(amg="No objects selected for render", pos="midCenter", fade=True, backColor=(0.25,0.25,0.25))
         return
 
-    created_ramps = []
-    created_textures = []
-
-    for obj in selection:
-        shapes = cmds.listRelatives(obj, shapes=True, fullPath=True) or []
-        if not shapes:
-            continue
+    cmds.undoInfo(openChunk=True)
+    cmds.refresh(suspend=True)
+    try:
+        created_ramps = []
+        created_textures = []
+        width = get_curve_width()
+        rate = get_sample_rate()
+
+        for obj in selection:
+            shapes = cmds.listRelatives(obj, shapes=True, fullPath=True) or []
+            if not shapes:
+                continue
 
-        base_name = safe_name(obj)
+            base_name = safe_name(obj)
 
-        try:
-            is_any_referenced = any(cmds.referenceQuery(s, isNodeReferenced=True) for s in shapes)
-        except Exception:
-            is_any_referenced = False
+            try:
+                is_any_referenced = any(cmds.referenceQuery(s, isNodeReferenced=True) for s in shapes)
+            except Exception:
+                is_any_referenced = False
 
-        if is_any_referenced:
-            ramp_name = unique_node_name("ramp_" + base_name)
-            texture_name = unique_node_name("place2dTexture_" + base_name)
-        else:
             ramp_name = "ramp_" + base_name
             texture_name = "place2dTexture_" + base_name
+            if is_any_referenced:
+                ramp_name = unique_node_name(ramp_name)
+                texture_name = unique_node_name(texture_name)
 
-        if shapes:
-            ensure_place2d_and_ramp(ramp_name, texture_name, shapes[0] + ".aiCurveShader")
+            created_ramps.append(ramp_name)
+            created_textures.append(texture_name)
 
-        created_ramps.append(ramp_name)
-        created_textures.append(texture_name)
-
-        for shape in shapes:
-            try:
-                if cmds.nodeType(shape) != "nurbsCurve":
+            for shape in shapes:
+                fn = get_node_fn(shape)
+                if fn.typeName != "nurbsCurve":
                     continue
-            except Exception:
-                continue
-
-            curve_shader_attr = shape + ".aiCurveShader"
-
-            existing = cmds.listConnections(curve_shader_attr, plugs=True, source=True, destination=False) or []
-            for old in existing:
-                try:
-                    cmds.disconnectAttr(old, curve_shader_attr)
-                except Exception:
-                    pass
 
-            ensure_place2d_and_ramp(ramp_name, texture_name, curve_shader_attr)
+                curve_shader_attr = shape + ".aiCurveShader"
 
-            rgb = get_current_color_of_shape(shape)
-            set_ramp_color(ramp_name, rgb)
-
-            try:
-                if cmds.attributeQuery('aiRenderCurve', node=shape, exists=True):
-                    cmds.setAttr(shape + '.aiRenderCurve', 1)
-            except Exception:
-                pass
+                existing = cmds.listConnections(curve_shader_attr, plugs=True, source=True, destination=False) or []
+                for old in existing:
+                    try:
+                        cmds.disconnectAttr(old, curve_shader_attr)
+                    except Exception:
+                        pass
 
-            try:
-                if cmds.attributeQuery('aiCurveWidth', node=shape, exists=True):
-                    cmds.setAttr(shape + '.aiCurveWidth', get_curve_width())
-            except Exception:
-                pass
+                ensure_place2d_and_ramp(ramp_name, texture_name, curve_shader_attr)
 
-            try:
-                if cmds.attributeQuery('aiSampleRate', node=shape, exists=True):
-                    cmds.setAttr(shape + '.aiSampleRate', get_sample_rate())
-            except Exception:
-                pass
+                rgb = get_current_color_of_shape(shape)
+                set_ramp_color(ramp_name, rgb)
 
-            for attr in [
-                'castsShadows', 'aiVisibleInDiffuseReflection', 'aiVisibleInSpecularReflection',
-                'aiVisibleInDiffuseTransmission', 'aiVisibleInSpecularTransmission', 'aiVisibleInVolume',
-                'aiSelfShadows'
-            ]:
-                try:
-                    if cmds.attributeQuery(attr, node=shape, exists=True):
-                        cmds.setAttr(shape + '.' + attr, 0)
-                except Exception:
-                    pass
+                set_attr_if_present(fn, shape, 'aiRenderCurve', 1)
+                set_attr_if_present(fn, shape, 'aiCurveWidth', width)
+                set_attr_if_present(fn, shape, 'aiSampleRate', rate)
+                for attr in RENDER_HIDDEN_ATTRS:
+                    set_attr_if_present(fn, shape, attr, 0)
 
-    cleanup_unused_ramps_and_textures(created_ramps, created_textures)
+        cleanup_unused_ramps_and_textures(created_ramps, created_textures)
+    finally:
+        cmds.refresh(suspend=False)
+        cmds.undoInfo(closeChunk=True)
 
     cmds.inViewMessage(amg="Render settings applied to selected controls", pos="midCenter", fade=True, backColor=(0.2,0.2,0.2))
     
@@ -466,15 +602,14 @@ def render_selected_controls():
 def save_config(blocks):
     data = {}
     for title, info in blocks.items():
-        slider = info["slider"]
-        idx = int(cmds.intSlider(slider, q=True, value=True))
+        idx = info["value"]
         if idx >= 0:
             data[title] = {"index": idx, "name": INDEXED_COLORS.get(idx, f"Index {idx}")}
         else:
             data[title] = {"index": -1, "rgb": info.get("rgb")}
     data["RenderRigControls"] = {
-        "curveWidth": cmds.floatField(curve_width, q=True, value=True),
-        "sampleRate": cmds.intField(sample_rate, q=True, value=True)
+        "curveWidth": get_curve_width(),
+        "sampleRate": get_sample_rate()
     }
     write_json_config(data)
 
@@ -490,55 +625,34 @@ def normalize_saved_block(block):
         rgb = block.get("rgb")
         if rgb is None:
             return {"index": -1}
-        return {"index": -1, "rgb": [float(rgb[0]), float(rgb[1]), float(rgb[2])]}
+        return {"index": -1, "rgb": (float(rgb[0]), float(rgb[1]), float(rgb[2]))}
 
-# Check if current UI settings differ from saved config
-def has_unsaved_changes(blocks):
-    saved_config = read_json_config()
-    current = {}
+def snapshot_blocks(blocks):
+    # Normalized view of the current UI state, comparable with snapshot_saved_config
+    snapshot = {}
     for title, info in blocks.items():
-        slider_val = int(cmds.intSlider(info["slider"], q=True, value=True))
-        if slider_val >= 0:
-            current[title] = {"index": slider_val}
-        else:
-            current[title] = {"index": -1, "rgb": info.get("rgb")}
+        snapshot[title] = normalize_saved_block({"index": info["value"], "rgb": info.get("rgb")})
+    snapshot["RenderRigControls"] = {
+        "curveWidth": float(get_curve_width()),
+        "sampleRate": int(get_sample_rate())
+    }
+    return snapshot
 
-    current["RenderRigControls"] = {
-        "curveWidth": float(cmds.floatField(curve_width, q=True, value=True)),
-        "sampleRate": int(cmds.intField(sample_rate, q=True, value=True))
+def snapshot_saved_config(saved_config, titles):
+    snapshot = {title: normalize_saved_block(saved_config.get(title)) for title in titles}
+    saved_rig = saved_config.get("RenderRigControls", {})
+    snapshot["RenderRigControls"] = {
+        "curveWidth": float(saved_rig.get("curveWidth", 0.0)),
+        "sampleRate": int(saved_rig.get("sampleRate", 1))
     }
+    return snapshot
 
+# Check if current UI settings differ from saved config
+def has_unsaved_changes(blocks):
+    saved_config = read_json_config()
     if not saved_config:
         return True
-
-    saved_rig = saved_config.get("RenderRigControls", {})
-    if float(saved_rig.get("curveWidth", 0.0)) != current["RenderRigControls"]["curveWidth"]:
-        return True
-    
-    if int(saved_rig.get("sampleRate", 1)) != current["RenderRigControls"]["sampleRate"]:
-        return True
-
-    for k, v in current.items():
-        if k == "RenderRigControls":
-            continue
-        saved_block = saved_config.get(k, {})
-        saved_norm = normalize_saved_block(saved_block)
-        if saved_norm is None:
-            return True
-        
-        if v.get("index") != saved_norm.get("index"):
-            return True
-        
-        if v.get("index") == -1:
-            saved_rgb = saved_norm.get("rgb")
-            cur_rgb = v.get("rgb")
-            if saved_rgb is None and cur_rgb is None:
-                continue
-
-            if saved_rgb != cur_rgb:
-                return True
-            
-    return False
+    return snapshot_blocks(blocks) != snapshot_saved_config(saved_config, blocks)
 
 
 
@@ -576,7 +690,7 @@ def close_panel(blocks):
 
 # Build the main color panel UI inside the given Maya workspace control
 def build_ui(parent=None):
-    global _color_ui_blocks, _color_ui_scroll, curve_width, sample_rate
+    global _color_ui_blocks, _color_ui_scroll
 
     if _color_ui_scroll and cmds.scrollLayout(_color_ui_scroll, exists=True):
         cmds.deleteUI(_color_ui_scroll)
@@ -589,6 +703,9 @@ def build_ui(parent=None):
         parent=parent
     )
 
+    # Tied to the scroll layout so cache invalidation stops on rebuild or close
+    watch_selection_paths(_color_ui_scroll)
+
     main_layout = cmds.columnLayout(adjustableColumn=True, rowSpacing=10,
                                     columnAttach=("both",10), parent=_color_ui_scroll)
     
@@ -596,6 +713,7 @@ def build_ui(parent=None):
     cmds.text(label='<h1>SELECT A COLOR FOR YOUR CONTROL</h1>', height=30, align='center')
     cmds.separator(height=10, style='none')
 
+    _build_index_rgb()
     saved_config = read_json_config()
     _color_ui_blocks = {}
 
@@ -618,15 +736,19 @@ def build_ui(parent=None):
     saved_rig = saved_config.get("RenderRigControls", {})
     cw_default = saved_rig.get("curveWidth", 1.0)
     sr_default = saved_rig.get("sampleRate", 1)
+    _render_settings["curveWidth"] = float(cw_default)
+    _render_settings["sampleRate"] = int(sr_default)
 
     cmds.rowLayout(nc=2, columnWidth2=[150,300], adjustableColumn=2, columnAttach=[(1,'both',0),(2,'both',0)])
     cmds.text(label="Curve Width:", align='right')
-    curve_width = cmds.floatField(precision=3, minValue=0.0, maxValue=100.0, value=cw_default)
+    cmds.floatField(precision=3, minValue=0.0, maxValue=100.0, value=cw_default,
+                    changeCommand=lambda v: _render_settings.__setitem__("curveWidth", float(v)))
     cmds.setParent('..')
 
     cmds.rowLayout(nc=2, columnWidth2=[150,300], adjustableColumn=2, columnAttach=[(1,'both',0),(2,'both',0)])
     cmds.text(label="Sample Rate:", align='right')
-    sample_rate = cmds.intField(minValue=1, maxValue=100, value=sr_default)
+    cmds.intField(minValue=1, maxValue=100, value=sr_default,
+                  changeCommand=lambda v: _render_settings.__setitem__("sampleRate", int(v)))
     cmds.setParent('..')
 
     cmds.separator(height=8, style='none')